@@ -5,17 +5,288 @@ Handles all API interactions with proper error handling and validation.
 
 import requests
 import os
+import re
 import logging
+import functools
+import threading
+import gzip
+import hashlib
+import time
+from pathlib import Path
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterable, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional: orjson for faster JSON decoding/encoding
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    import json
+    HAS_ORJSON = False
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a JSON document from bytes."""
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes."""
+    return orjson.dumps(obj) if HAS_ORJSON else json.dumps(obj).encode("utf-8")
 
-# Load .env file
-load_dotenv()
+
+# Optional: httpx for HTTP/2 order-detail fetches (opt-in via API_HTTP2)
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+__all__ = [
+    "get_orders",
+    "get_timesheet",
+    "get_order_details",
+    "get_order_details_many",
+    "close_session",
+    "clean_token",
+    "get_validated_token",
+]
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://tintasberger.solutechlabs.com"
 
+# Surrounding whitespace and quotes, stripped from tokens in one pass
+_TOKEN_EDGES = re.compile(r'^[\s"\']+|[\s"\']+$')
+
+# str.translate table that deletes ASCII control characters
+_CTRL_TABLE = dict.fromkeys(range(32))
+
+# Transport errors raised by either HTTP client
+_REQUEST_ERRORS = (requests.RequestException, httpx.HTTPError) if HAS_HTTPX else (requests.RequestException,)
+
+
+# ============================================================================
+# HTTP SESSION
+# ============================================================================
+
+@functools.cache
+def _load_environment() -> None:
+    """
+    Load the .env file and check the access token (fail fast), once.
+
+    Done on first API use rather than at import time, so importing this
+    module stays cheap for tools that never hit the network.
+    """
+    load_dotenv()
+
+    try:
+        get_validated_token()
+        logger.info("✅ Access token validated successfully")
+    except ValueError as e:
+        logger.warning(f"⚠️ Token validation issue: {e}")
+        logger.warning("This may be expected in CI/CD environments with masked secrets")
+
+
+@functools.cache
+def _api_timeout() -> int:
+    """Request timeout in seconds (API_TIMEOUT, default 30)."""
+    _load_environment()
+    return int(os.getenv("API_TIMEOUT", "30"))
+
+
+@functools.cache
+def _max_concurrency() -> int:
+    """Maximum order-detail requests in flight (MAX_CONCURRENT_REQUESTS, default 16)."""
+    _load_environment()
+    return max(1, int(os.getenv("MAX_CONCURRENT_REQUESTS", "16")))
+
+
+@functools.cache
+def _api_cache_dir() -> Optional[Path]:
+    """
+    Directory for the on-disk API response cache (API_CACHE_DIR).
+
+    Returns None when the cache is disabled (the default) or the directory
+    cannot be created.
+    """
+    _load_environment()
+
+    cache_dir = os.getenv("API_CACHE_DIR", "").strip()
+    if not cache_dir:
+        return None
+
+    path = Path(cache_dir)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"API cache disabled, cannot create {path}: {e}")
+        return None
+
+    _prune_api_cache(path)
+    return path
+
+
+def _prune_api_cache(cache_dir: Path) -> None:
+    """Delete cached responses older than API_CACHE_TTL (once per run)."""
+    cutoff = time.time() - _api_cache_ttl()
+    removed = 0
+    for cache_file in cache_dir.glob("*.json.gz"):
+        try:
+            if cache_file.stat().st_mtime < cutoff:
+                cache_file.unlink()
+                removed += 1
+        except OSError:
+            # Removed by a concurrent run, or not ours to delete
+            continue
+
+    if removed:
+        logger.info(f"Pruned {removed} expired API cache entries")
+
+
+@functools.cache
+def _api_cache_ttl() -> int:
+    """Seconds a cached API response stays fresh (API_CACHE_TTL, default 3600)."""
+    _load_environment()
+    return int(os.getenv("API_CACHE_TTL", "3600"))
+
+
+def _response_cache_file(name: str, key: str) -> Optional[Path]:
+    """Cache file for one API response, or None when caching is off."""
+    cache_dir = _api_cache_dir()
+    if cache_dir is None or _api_cache_ttl() <= 0:
+        return None
+    digest = hashlib.sha256(f"{name}:{key}".encode("utf-8")).hexdigest()[:32]
+    return cache_dir / f"{name}-{digest}.json.gz"
+
+
+def _read_cached_response(name: str, key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached API response if one exists and is still fresh."""
+    cache_file = _response_cache_file(name, key)
+    if cache_file is None:
+        return None
+
+    try:
+        if time.time() - cache_file.stat().st_mtime >= _api_cache_ttl():
+            cache_file.unlink()
+            return None
+        data = _json_loads(gzip.decompress(cache_file.read_bytes()))
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError) as e:
+        # EOFError: a truncated gzip entry from an interrupted write
+        logger.warning(f"Ignoring unreadable {name} cache entry: {e}")
+        return None
+
+    logger.debug(f"Using cached {name} response ({cache_file.name})")
+    return data
+
+
+def _write_cached_response(name: str, key: str, data: Dict[str, Any]) -> None:
+    """Store an API response in the cache (no-op when caching is off)."""
+    cache_file = _response_cache_file(name, key)
+    if cache_file is None:
+        return
+
+    try:
+        cache_file.write_bytes(gzip.compress(_json_dumps(data), compresslevel=1))
+    except OSError as e:
+        logger.warning(f"Could not cache {name} response: {e}")
+
+
+def _build_session() -> requests.Session:
+    """
+    Create the HTTP session shared by all API calls.
+
+    Reusing one session keeps connections to the API host alive between
+    requests, so only the first call pays for the TCP/TLS handshake.
+    """
+    session = requests.Session()
+
+    # Retry transient failures on idempotent GETs only, waiting as long as
+    # the server asks via Retry-After on 429/503
+    max_retries = int(os.getenv("MAX_RETRIES", "3"))
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    )
+
+    # Pool sized to at least the order-details worker count, so concurrent
+    # fetches never wait for (or discard) a connection
+    pool_size = max(32, _max_concurrency())
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    # requests already sends Accept-Encoding: gzip, deflate (plus br/zstd
+    # when brotli/zstandard are installed) and decodes the bodies itself
+    session.headers.update({"Accept": "application/json"})
+
+    return session
+
+
+@functools.cache
+def _session() -> requests.Session:
+    """Return the shared session, creating it on first use."""
+    _load_environment()
+    return _build_session()
+
+
+@functools.cache
+def _http2_client() -> Optional["httpx.Client"]:
+    """
+    Return a shared HTTP/2 client for order-detail fetches, if enabled.
+
+    With API_HTTP2=true and httpx[http2] installed, concurrent order-detail
+    requests are multiplexed over a single connection. Otherwise returns
+    None and the requests session is used.
+    """
+    _load_environment()
+
+    if os.getenv("API_HTTP2", "").lower() != "true":
+        return None
+
+    if not HAS_HTTPX:
+        logger.warning("API_HTTP2 is enabled but httpx is not installed, using HTTP/1.1")
+        return None
+
+    try:
+        return httpx.Client(
+            http2=True,
+            headers={"Accept": "application/json"},
+            timeout=_api_timeout(),
+            # Sized like the requests pool, so no worker waits for a connection
+            limits=httpx.Limits(
+                max_connections=max(32, _max_concurrency()),
+                max_keepalive_connections=max(32, _max_concurrency()),
+            ),
+        )
+    except ImportError as e:
+        # http2=True needs the h2 package
+        logger.warning(f"HTTP/2 unavailable, using HTTP/1.1: {e}")
+        return None
+
+
+def close_session() -> None:
+    """Close all pooled connections held by the shared session."""
+    if _session.cache_info().currsize:
+        _session().close()
+        _session.cache_clear()
+
+    if _http2_client.cache_info().currsize:
+        client = _http2_client()
+        if client is not None:
+            client.close()
+        _http2_client.cache_clear()
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -42,10 +313,10 @@ def clean_token(token: str) -> str:
         token = token.decode('utf-8')
 
     # Strip whitespace and quotes
-    token = str(token).strip().strip('"').strip("'")
+    token = _TOKEN_EDGES.sub('', str(token))
 
     # Remove any control characters
-    token = ''.join(char for char in token if ord(char) >= 32)
+    token = token.translate(_CTRL_TABLE)
 
     # Check if token was masked (common in CI/CD)
     if token == '***' or token.startswith('***'):
@@ -86,6 +357,20 @@ def get_validated_token() -> str:
         raise
 
 
+@functools.lru_cache(maxsize=8)
+def _auth_headers(access_token: str) -> Dict[str, str]:
+    """
+    Build the bearer authorization header for a token.
+
+    The token is cleaned once and the header dict is reused for every
+    request made with the same token.
+
+    Raises:
+        ValueError: If token is invalid
+    """
+    return {"Authorization": f"Bearer {clean_token(access_token)}"}
+
+
 # ============================================================================
 # API FUNCTIONS
 # ============================================================================
@@ -104,22 +389,27 @@ def get_orders(access_token: str, query_string: str) -> Dict[str, Any]:
     Raises:
         requests.RequestException: If API request fails
     """
+    cached = _read_cached_response("orders", query_string)
+    if cached is not None:
+        return cached
+
     try:
-        # Clean and validate token
-        clean_access_token = clean_token(access_token)
+        # Cleaned and validated once per token
+        headers = _auth_headers(access_token)
 
         url = f"{BASE_URL}/api/v1/get-v2-orders{query_string}"
-        headers = {
-            "Authorization": f"Bearer {clean_access_token}",
-            "Accept": "application/json",
-        }
 
         logger.debug(f"Fetching orders from: {url}")
 
-        response = requests.get(url, headers=headers, timeout=30)
+        response = _session().get(url, headers=headers, timeout=_api_timeout())
         response.raise_for_status()
 
-        return response.json()
+        logger.debug(
+            f"Orders response: {len(response.content)} bytes, "
+            f"Content-Encoding={response.headers.get('Content-Encoding', 'identity')}"
+        )
+
+        orders = _json_loads(response.content)
 
     except ValueError as e:
         logger.error(f"Token validation error: {e}")
@@ -128,6 +418,9 @@ def get_orders(access_token: str, query_string: str) -> Dict[str, Any]:
         logger.error(f"API request failed: {e}")
         raise
 
+    _write_cached_response("orders", query_string, orders)
+    return orders
+
 
 def get_timesheet(headers: dict, cookies: dict, params: dict) -> Dict[str, Any]:
     """
@@ -144,6 +437,11 @@ def get_timesheet(headers: dict, cookies: dict, params: dict) -> Dict[str, Any]:
     Raises:
         requests.RequestException: If API request fails
     """
+    cache_key = repr(sorted(params.items()))
+    cached = _read_cached_response("timesheet", cache_key)
+    if cached is not None:
+        return cached
+
     try:
         # Clean headers that might contain tokens
         cleaned_headers = {}
@@ -162,16 +460,16 @@ def get_timesheet(headers: dict, cookies: dict, params: dict) -> Dict[str, Any]:
 
         logger.debug(f"Fetching timesheet from: {url}")
 
-        response = requests.get(
+        response = _session().get(
             url,
             headers=cleaned_headers,
             cookies=cookies,
             params=params,
-            timeout=30
+            timeout=_api_timeout()
         )
         response.raise_for_status()
 
-        return response.json()
+        timesheet = _json_loads(response.content)
 
     except ValueError as e:
         logger.error(f"Header validation error: {e}")
@@ -180,11 +478,18 @@ def get_timesheet(headers: dict, cookies: dict, params: dict) -> Dict[str, Any]:
         logger.error(f"API request failed: {e}")
         raise
 
+    _write_cached_response("timesheet", cache_key, timesheet)
+    return timesheet
+
 
 def get_order_details(access_token: str, order_number: int | str) -> Dict[str, Any]:
     """
     Fetch details for a single order by order number.
 
+    Responses are cached in memory, so an order that shows up more than once
+    in a run is only requested from the API once. The returned dict is shared
+    between callers and must not be modified.
+
     Args:
         access_token: API bearer token
         order_number: Order number to fetch details for
@@ -195,39 +500,101 @@ def get_order_details(access_token: str, order_number: int | str) -> Dict[str, A
     Raises:
         requests.RequestException: If API request fails
     """
+    return _get_order_details_cached(access_token, order_number)
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_order_details_cached(access_token: str, order_number: int | str) -> Dict[str, Any]:
+    """Fetch order details from the API (cached by token and order number)."""
+    cached = _read_cached_response("order_details", str(order_number))
+    if cached is not None:
+        return cached
+
     try:
-        # Clean and validate token
-        clean_access_token = clean_token(access_token)
+        # Cleaned and validated once per token
+        headers = _auth_headers(access_token)
 
         url = f"{BASE_URL}/api/v1/get-v2-order-details/{order_number}"
-        headers = {
-            "Authorization": f"Bearer {clean_access_token}",
-            "Accept": "application/json",
-        }
 
         logger.debug(f"Fetching order details for order: {order_number}")
 
-        response = requests.get(url, headers=headers, timeout=30)
+        client = _http2_client()
+        if client is not None:
+            response = client.get(url, headers=headers)
+        else:
+            response = _session().get(url, headers=headers, timeout=_api_timeout())
         response.raise_for_status()
 
-        return response.json()
+        details = _json_loads(response.content)
 
     except ValueError as e:
         logger.error(f"Token validation error: {e}")
         raise
-    except requests.RequestException as e:
+    except _REQUEST_ERRORS as e:
         logger.error(f"API request failed for order {order_number}: {e}")
         raise
 
+    _write_cached_response("order_details", str(order_number), details)
+    return details
 
-# ============================================================================
-# VALIDATION ON MODULE LOAD
-# ============================================================================
 
-# Validate token when module is imported (fail fast)
-try:
-    _validated_token = get_validated_token()
-    logger.info("✅ Access token validated successfully")
-except ValueError as e:
-    logger.warning(f"⚠️ Token validation issue on module load: {e}")
-    logger.warning("This may be expected in CI/CD environments with masked secrets")
+def get_order_details_many(
+    access_token: str,
+    order_numbers: Iterable[int | str],
+    max_workers: Optional[int] = None,
+    stop: Optional[threading.Event] = None
+) -> Dict[int | str, Dict[str, Any]]:
+    """
+    Fetch details for several orders concurrently.
+
+    Requests are I/O bound, so a small thread pool overlaps the round-trips
+    while the shared session keeps the connections alive.
+
+    Args:
+        access_token: API bearer token
+        order_numbers: Order numbers to fetch details for
+        max_workers: Maximum number of requests in flight at once
+            (defaults to MAX_CONCURRENT_REQUESTS)
+        stop: Optional event; once set, orders not yet requested are
+            skipped so a caller that gave up is not kept waiting
+
+    Returns:
+        Mapping of order number to its details. Orders that fail to fetch
+        are logged and left out of the mapping.
+    """
+    unique_orders = list(dict.fromkeys(order_numbers))
+    details: Dict[int | str, Dict[str, Any]] = {}
+
+    if not unique_orders:
+        return details
+
+    # Create the shared client and cache dir before the worker threads race to do it
+    _http2_client()
+    _api_cache_dir()
+
+    if max_workers is None:
+        max_workers = _max_concurrency()
+
+    def fetch(order_number: int | str) -> Optional[Dict[str, Any]]:
+        if stop is not None and stop.is_set():
+            return None
+        return get_order_details(access_token, order_number)
+
+    workers = max(1, min(max_workers, len(unique_orders)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(fetch, order_number): order_number
+            for order_number in unique_orders
+        }
+        for future in as_completed(futures):
+            order_number = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error fetching order {order_number}: {e}")
+                continue
+            if result is not None:
+                details[order_number] = result
+
+    return details
+
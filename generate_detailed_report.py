@@ -4,23 +4,36 @@ Generates detailed Excel reports with visits, orders, and product details.
 """
 
 import pandas as pd
+import numpy as np
 import os
+import re
+import csv
+import gc
 import logging
+import threading
+import operator
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Set, Tuple
 from dataclasses import dataclass
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
-# Optional: dataframe_image for summary export
+# Optional: matplotlib for summary image export (no headless browser needed)
 try:
-    import dataframe_image as dfi
-    HAS_DFI = True
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    HAS_MPL = True
 except ImportError:
-    HAS_DFI = False
-    logging.warning("dataframe_image not installed. Summary image export disabled.")
+    HAS_MPL = False
+    logging.warning("matplotlib not installed. Summary image export disabled.")
 
-from api_client import get_order_details
+from api_client import get_order_details_many
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +42,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Thousands-separated, two-decimal money text (e.g. "1,234.50")
+_MONEY_FORMAT = "{:,.2f}".format
+
 
 # ============================================================================
 # CONFIGURATION
@@ -40,6 +56,7 @@ class ReportConfig:
     output_file: str = "Daily_CSFA_Report.xlsx"
     summary_text_file: str = "summary_for_email.txt"
     summary_image_file: str = "summary_sheet.png"
+    csv_dir: str = ""  # Also export sheets as CSV here (disabled if empty)
 
     # Styling colors
     header_color: str = "4F81BD"
@@ -60,6 +77,7 @@ class ReportConfig:
             output_file=os.getenv("OUTPUT_FILE", "Daily_CSFA_Report.xlsx"),
             summary_text_file=os.getenv("SUMMARY_TEXT_FILE", "summary_for_email.txt"),
             summary_image_file=os.getenv("SUMMARY_IMAGE_FILE", "summary_sheet.png"),
+            csv_dir=os.getenv("CSV_EXPORT_DIR", ""),
         )
 
 
@@ -70,79 +88,101 @@ class ReportConfig:
 class DataProcessor:
     """Handles data cleaning and processing."""
 
+    # API field -> report column
+    VISIT_COLUMNS = {
+        "rep_name": "sales_rep",
+        "shop_name": "customer_name",
+        "erp_code": "erp_code",
+        "timespent": "time_spent",
+    }
+    ORDER_COLUMNS = {
+        "sales_rep": "sales_rep",
+        "customer_name": "customer_name",
+        "customer_code": "customer_code",
+        "id": "order_id",
+        "balance": "order_value",
+    }
+
+    @staticmethod
+    def _to_frame(records: List[Dict], columns: Dict[str, str]) -> pd.DataFrame:
+        """
+        Build a frame from API records, keeping only the mapped fields.
+
+        Each field is gathered into its own list first, so pandas builds
+        the columns straight from arrays instead of walking every dict.
+        """
+        return pd.DataFrame(
+            {column: [record.get(field) for record in records] for field, column in columns.items()},
+            columns=list(columns.values())
+        )
+
     @staticmethod
     def clean_visits(visits_data: List[Dict]) -> pd.DataFrame:
         """Clean and structure visits data."""
-        visit_rows = []
-        for v in visits_data:
-            erp_code = v.get("erp_code") or ""
-            visit_rows.append({
-                "sales_rep": v.get("rep_name", ""),
-                "customer_name": (v.get("shop_name") or "").strip(),
-                "erp_code": erp_code.strip() if erp_code else "",
-                "time_spent": v.get("timespent", "")
-            })
-        return pd.DataFrame(visit_rows)
+        df = DataProcessor._to_frame(visits_data, DataProcessor.VISIT_COLUMNS)
+
+        df["customer_name"] = df["customer_name"].fillna("").astype(str).str.strip()
+        df["erp_code"] = df["erp_code"].fillna("").astype(str).str.strip()
+        df["time_spent"] = df["time_spent"].fillna("")
+        return df
 
     @staticmethod
     def clean_orders(orders_data: List[Dict]) -> pd.DataFrame:
         """Clean and structure orders data."""
-        order_rows = []
-        for o in orders_data:
-            balance_str = o.get("balance", "0").replace(",", "").strip()
-            try:
-                balance = float(balance_str)
-            except (ValueError, TypeError):
-                balance = 0.0
-
-            order_rows.append({
-                "sales_rep": o.get("sales_rep", ""),
-                "customer_name": (o.get("customer_name") or "").strip(),
-                "customer_code": o.get("customer_code", ""),
-                "order_id": o.get("id"),
-                "order_value": balance
-            })
-        return pd.DataFrame(order_rows)
+        df = DataProcessor._to_frame(orders_data, DataProcessor.ORDER_COLUMNS)
+
+        df["customer_name"] = df["customer_name"].fillna("").astype(str).str.strip()
+
+        # Balances arrive as strings like "173,818.00"; unparseable values become 0
+        balance = df["order_value"].astype(str).str.replace(",", "", regex=False).str.strip()
+        df["order_value"] = pd.to_numeric(balance, errors="coerce").fillna(0.0)
+        return df
+
+    @staticmethod
+    def _order_lookup(df_orders: pd.DataFrame, key: str) -> pd.DataFrame:
+        """Aggregate orders into a lookup table indexed by a customer key."""
+        orders = df_orders[df_orders[key].notna() & (df_orders[key] != "")]
+        return orders.groupby(key, sort=False).agg(
+            sales_rep_order=("sales_rep", "first"),
+            order_value=("order_value", "sum"),
+        )
 
     @staticmethod
     def merge_visits_orders(
         df_visits: pd.DataFrame,
         df_orders: pd.DataFrame
     ) -> pd.DataFrame:
-        """Merge visits and orders data with fallback logic."""
-        # Merge by ERP code
-        df_merge_code = pd.merge(
-            df_visits,
-            df_orders,
-            left_on="erp_code",
-            right_on="customer_code",
-            how="left",
-            suffixes=("_visit", "_order")
-        )
-
-        # Merge by customer name
-        df_merge_name = pd.merge(
-            df_visits,
-            df_orders,
-            left_on="customer_name",
-            right_on="customer_name",
-            how="left",
-            suffixes=("_visit", "_order")
-        )
+        """
+        Attach order data to each visit.
 
-        # Combine both merges
-        df_final = df_merge_code.copy()
-        for col in ["order_value", "customer_code", "sales_rep_order", "order_id"]:
-            if col in df_merge_name.columns:
-                df_final[col] = df_final[col].combine_first(df_merge_name[col])
+        Orders are matched by ERP code, falling back to customer name for
+        visits without a code match. A customer with several orders gets
+        their combined order value.
+        """
+        if df_orders.empty:
+            # Nothing to match against
+            df_final = df_visits.reset_index(drop=True)
+            df_final["sales_rep_order"] = pd.Series(index=df_final.index, dtype=object)
+            df_final["order_value"] = np.nan
+            df_final["customer_name_final"] = df_final["customer_name"]
+            df_final["sales_rep_final"] = df_final["sales_rep"]
+            return df_final
+
+        by_code = DataProcessor._order_lookup(df_orders, "customer_code")
+        by_name = DataProcessor._order_lookup(df_orders, "customer_name")
+
+        matched = by_code.reindex(df_visits["erp_code"].to_numpy())
+        fallback = by_name.reindex(df_visits["customer_name"].to_numpy())
+
+        df_final = df_visits.reset_index(drop=True)
+        for col in matched.columns:
+            code_values = matched[col].to_numpy()
+            df_final[col] = np.where(pd.notna(code_values), code_values, fallback[col].to_numpy())
 
         # Create final columns
-        df_final["customer_name_final"] = df_final.get("customer_name_visit", pd.Series("")).combine_first(
-            df_final.get("customer_name_order", pd.Series(""))
-        )
-        df_final["sales_rep_final"] = df_final.get("sales_rep_visit", pd.Series("")).combine_first(
-            df_final.get("sales_rep_order", pd.Series(""))
-        )
+        df_final["customer_name_final"] = df_final["customer_name"]
+        sales_rep = df_final["sales_rep"].to_numpy()
+        df_final["sales_rep_final"] = np.where(pd.notna(sales_rep), sales_rep, df_final["sales_rep_order"].to_numpy())
 
         return df_final
 
@@ -152,10 +192,9 @@ class DataProcessor:
         df_orders: pd.DataFrame
     ) -> pd.DataFrame:
         """Find customers who were called but not visited."""
-        visited_customers = set(df_visits["customer_name"])
-        df_called = df_orders[~df_orders["customer_name"].isin(visited_customers)].copy()
-        df_called["customer_called"] = df_called["customer_name"]
-        return df_called
+        visited_customers = df_visits["customer_name"].unique()
+        called = ~df_orders["customer_name"].isin(visited_customers)
+        return df_orders.loc[called].assign(customer_called=lambda df: df["customer_name"])
 
     @staticmethod
     def get_sales_reps(
@@ -163,10 +202,11 @@ class DataProcessor:
         df_called: pd.DataFrame
     ) -> List[str]:
         """Get sorted list of all sales representatives."""
-        reps = set(df_final["sales_rep_final"].dropna()).union(
-            df_called["sales_rep"].dropna()
+        reps = np.union1d(
+            df_final["sales_rep_final"].dropna().unique(),
+            df_called["sales_rep"].dropna().unique()
         )
-        return sorted(reps)
+        return reps.tolist()
 
 
 # ============================================================================
@@ -176,9 +216,128 @@ class DataProcessor:
 class ExcelStyler:
     """Handles Excel worksheet styling."""
 
+    # Named styles registered on the workbook
+    SUMMARY_HEADER_STYLE = "csfa_summary_header"
+    SUMMARY_BODY_STYLE = "csfa_summary_body"
+    SUMMARY_MONEY_STYLE = "csfa_summary_money"
+    CUSTOMER_STYLE = "csfa_customer"
+    PRODUCT_HEADER_STYLE = "csfa_product_header"
+    PRODUCT_STYLE = "csfa_product"
+    NO_ORDERS_STYLE = "csfa_no_orders"
+    GRID_STYLE = "csfa_grid"
+
+    # Summary sheet layout
+    SUMMARY_COLUMN_WIDTHS = {
+        1: 25,  # SALESPERSON
+        2: 20,  # CUSTOMERS VISITED
+        3: 30,  # ORDER VALUE FROM VISITS
+        4: 20,  # CUSTOMERS CALLED
+        5: 30,  # ORDER VALUE FROM CALLS
+    }
+    SUMMARY_MONEY_COLUMNS = ("ORDER VALUE FROM VISITS", "ORDER VALUE FROM CALLS")
+
     def __init__(self, config: ReportConfig):
         self.config = config
 
+    def register_named_styles(self, workbook) -> None:
+        """
+        Register the report cell styles on the workbook.
+
+        Cells then reference a style by name, so openpyxl stores each
+        font/fill/alignment/border combination once instead of per cell.
+        """
+        thin_border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        wrap_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
+        center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+        body_font = Font(name=self.config.body_font_name, size=self.config.body_font_size)
+
+        styles = [
+            NamedStyle(
+                name=self.SUMMARY_HEADER_STYLE,
+                font=Font(
+                    name=self.config.header_font_name,
+                    size=self.config.header_font_size,
+                    bold=True,
+                    color="FFFFFF"
+                ),
+                fill=PatternFill(
+                    start_color=self.config.header_color,
+                    end_color=self.config.header_color,
+                    fill_type="solid"
+                ),
+                alignment=center_align,
+                border=thin_border,
+            ),
+            NamedStyle(
+                name=self.SUMMARY_BODY_STYLE,
+                font=body_font,
+                alignment=wrap_align,
+                border=thin_border,
+            ),
+            NamedStyle(
+                name=self.SUMMARY_MONEY_STYLE,
+                font=body_font,
+                alignment=wrap_align,
+                border=thin_border,
+                number_format='#,##0.00',
+            ),
+            NamedStyle(
+                name=self.CUSTOMER_STYLE,
+                font=Font(name=self.config.body_font_name, size=self.config.body_font_size, bold=True),
+                fill=PatternFill(
+                    start_color=self.config.customer_fill_color,
+                    end_color=self.config.customer_fill_color,
+                    fill_type="solid"
+                ),
+                alignment=wrap_align,
+                border=thin_border,
+            ),
+            NamedStyle(
+                name=self.PRODUCT_HEADER_STYLE,
+                font=Font(
+                    name=self.config.body_font_name,
+                    size=self.config.body_font_size,
+                    bold=True,
+                    color="FFFFFF"
+                ),
+                fill=PatternFill(
+                    start_color=self.config.product_header_color,
+                    end_color=self.config.product_header_color,
+                    fill_type="solid"
+                ),
+                alignment=center_align,
+                border=thin_border,
+            ),
+            NamedStyle(
+                name=self.PRODUCT_STYLE,
+                font=body_font,
+                alignment=wrap_align,
+                border=thin_border,
+            ),
+            NamedStyle(
+                name=self.NO_ORDERS_STYLE,
+                font=Font(
+                    name=self.config.body_font_name,
+                    size=self.config.body_font_size,
+                    color=self.config.error_color,
+                    bold=True
+                ),
+                alignment=center_align,
+                border=thin_border,
+            ),
+            NamedStyle(name=self.GRID_STYLE, font=DEFAULT_FONT, border=thin_border),
+        ]
+
+        for style in styles:
+            if style.name not in workbook.named_styles:
+                workbook.add_named_style(style)
+
     def calculate_row_height(self, text: str, column_width: float, font_size: int = 12) -> float:
         """
         Calculate the required row height for wrapped text.
@@ -224,119 +383,111 @@ class ExcelStyler:
         # Ensure minimum height of 18 points, maximum of 409 (Excel limit)
         return max(18, min(409, calculated_height))
 
-    def apply_summary_styling(self, ws: Worksheet) -> None:
-        """Apply styling to summary sheet (wrap text, wider columns, with borders)."""
-        if not ws or ws.max_row == 0:
-            logger.warning("Empty worksheet, skipping styling")
-            return
-
-        # Define border style
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        # Style header row
-        header_font = Font(
-            name=self.config.header_font_name,
-            size=self.config.header_font_size,
-            bold=True,
-            color="FFFFFF"
-        )
-        header_fill = PatternFill(
-            start_color=self.config.header_color,
-            end_color=self.config.header_color,
-            fill_type="solid"
-        )
-        header_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-        try:
-            for col_idx, cell in enumerate(ws[1], start=1):
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_align
-                cell.border = thin_border
-        except IndexError:
-            logger.warning("Cannot style header row - worksheet may be empty")
-            return
-
-        # Style body rows
-        body_font = Font(
-            name=self.config.body_font_name,
-            size=self.config.body_font_size
-        )
-        body_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    @staticmethod
+    def set_column_widths(ws: WriteOnlyWorksheet, column_widths: Dict[int, float]) -> None:
+        """Set column widths (write-only sheets need this before the first row)."""
+        for col_idx, width in column_widths.items():
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
 
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-            for cell in row:
-                cell.font = body_font
-                cell.alignment = body_align
-                cell.border = thin_border
+    @staticmethod
+    def _height_text(value: Any) -> str:
+        """Text that counts towards a cell's row height ("" if it doesn't)."""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return ""
+        if not value or pd.isna(value):
+            return ""
+        return str(value)
+
+    def fit_row_heights(self, rows: List[List[Any]], column_widths: Dict[int, float]) -> List[float]:
+        """
+        Heights needed to show every value of each row with wrapped text.
 
-        # Set wider column widths to minimize wrapping
-        column_widths = {
-            1: 25,  # SALESPERSON
-            2: 20,  # CUSTOMERS VISITED
-            3: 30,  # ORDER VALUE FROM VISITS
-            4: 20,  # CUSTOMERS CALLED
-            5: 30,  # ORDER VALUE FROM CALLS
-        }
+        Same result as calculate_row_height per cell, but the line counts
+        and heights are computed a whole column at a time with numpy.
+        Cells with explicit line breaks take the per-cell path.
+        """
+        n_rows = len(rows)
+        heights = np.full(n_rows, 18.0)  # Default minimum height for data rows
+        if not n_rows:
+            return heights.tolist()
 
-        for col_idx, width in column_widths.items():
-            if col_idx <= ws.max_column:
-                column = get_column_letter(col_idx)
-                ws.column_dimensions[column].width = width
+        font_size = self.config.body_font_size
+        line_height = font_size * 1.3
+        n_cols = max(len(row) for row in rows)
+
+        for col_idx in range(n_cols):
+            # Get column width for this column
+            col_width = column_widths.get(col_idx + 1, 20)
+            chars_per_line = max(1, int(col_width * 0.85))
+
+            texts = [self._height_text(row[col_idx]) if col_idx < len(row) else "" for row in rows]
+            lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n_rows)
+
+            # Wrapped lines per cell (ceil division), padded and clamped to Excel's limits
+            lines = np.maximum(1, -(-lengths // chars_per_line))
+            col_heights = np.where(
+                lengths > 0,
+                np.clip(lines * line_height + 8, 18, 409),
+                18.0
+            )
 
-        # Set header row height (row 1)
-        ws.row_dimensions[1].height = 30  # Fixed height for header
+            for i, text in enumerate(texts):
+                if "\n" in text:
+                    col_heights[i] = self.calculate_row_height(text, col_width, font_size)
 
-        # Calculate and set row heights for data rows (row 2 onwards)
-        for row_idx in range(2, ws.max_row + 1):
-            max_height = 18  # Default minimum height for data rows
+            heights = np.maximum(heights, col_heights)
 
-            for col_idx in range(1, ws.max_column + 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                cell_value = cell.value
+        return heights.tolist()
 
-                # Skip empty cells
-                if cell_value is None or (isinstance(cell_value, str) and not cell_value.strip()):
-                    continue
+    @staticmethod
+    def append_styled_row(
+        ws: WriteOnlyWorksheet,
+        row_idx: int,
+        values: List[Any],
+        styles: List[str],
+        height: float
+    ) -> None:
+        """
+        Append one row of named-style cells to a write-only sheet.
 
-                # Get column width for this column
-                col_width = column_widths.get(col_idx, 20)
+        The row height is recorded first, since a streamed row cannot be
+        changed once it has been written.
+        """
+        ws.row_dimensions[row_idx].height = height
 
-                # Calculate required height
-                try:
-                    height = self.calculate_row_height(cell_value, col_width, self.config.body_font_size)
-                    max_height = max(max_height, height)
-                except Exception as e:
-                    logger.warning(f"Could not calculate height for row {row_idx}, col {col_idx}: {e}")
-                    max_height = max(max_height, 35)  # Fallback to larger height
+        row = []
+        for value, style in zip(values, styles):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            row.append(cell)
+        ws.append(row)
 
-            # Set the row height
-            ws.row_dimensions[row_idx].height = max_height
+    def write_summary_sheet(self, ws: WriteOnlyWorksheet, df_summary: pd.DataFrame) -> None:
+        """
+        Stream the summary table to the worksheet, styling each row as it is written
+        (wrap text, wider columns, with borders).
+        """
+        headers = list(df_summary.columns)
 
-    def _auto_adjust_columns(self, ws: Worksheet) -> None:
-        """Auto-adjust column widths based on content."""
-        for col_idx, col in enumerate(ws.columns, start=1):
-            max_length = 0
-            column = get_column_letter(col_idx)
+        # Set wider column widths to minimize wrapping
+        self.set_column_widths(
+            ws,
+            {col_idx: width for col_idx, width in self.SUMMARY_COLUMN_WIDTHS.items() if col_idx <= len(headers)}
+        )
 
-            for cell in col:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
+        # Header row - fixed height
+        self.append_styled_row(ws, 1, headers, [self.SUMMARY_HEADER_STYLE] * len(headers), 30)
 
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50
-            ws.column_dimensions[column].width = adjusted_width
+        body_styles = [
+            self.SUMMARY_MONEY_STYLE if col in self.SUMMARY_MONEY_COLUMNS else self.SUMMARY_BODY_STYLE
+            for col in headers
+        ]
 
-    def format_money_columns(self, ws: Worksheet, columns: List[int]) -> None:
-        """Format specific columns as money."""
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
-            for col_idx in columns:
-                if col_idx < len(row):
-                    row[col_idx].number_format = '#,##0.00'
+        # Data rows - size every row from its values before streaming them
+        rows = list(df_summary.itertuples(index=False, name=None))
+        heights = self.fit_row_heights(rows, self.SUMMARY_COLUMN_WIDTHS)
+        for row_idx, (values, height) in enumerate(zip(rows, heights), start=2):
+            self.append_styled_row(ws, row_idx, values, body_styles, height)
 
 
 # ============================================================================
@@ -346,6 +497,14 @@ class ExcelStyler:
 class SummaryGenerator:
     """Generates summary reports."""
 
+    COLUMNS = [
+        "SALESPERSON",
+        "CUSTOMERS VISITED",
+        "ORDER VALUE FROM VISITS",
+        "CUSTOMERS CALLED",
+        "ORDER VALUE FROM CALLS",
+    ]
+
     @staticmethod
     def generate_summary(
         reps: List[str],
@@ -353,28 +512,25 @@ class SummaryGenerator:
         df_called: pd.DataFrame
     ) -> pd.DataFrame:
         """Generate summary statistics for each sales rep."""
-        summary_rows = []
-
-        for rep in reps:
-            # Visits data
-            rep_visits = df_final[df_final["sales_rep_final"] == rep]
-            customers_visited = rep_visits["customer_name_final"].nunique()
-            order_value_visits = rep_visits["order_value"].sum()
+        # Visits data - one grouped pass instead of filtering per rep
+        visits = df_final.groupby("sales_rep_final").agg(
+            customers_visited=("customer_name_final", "nunique"),
+            order_value_visits=("order_value", "sum"),
+        )
 
-            # Calls data
-            rep_calls = df_called[df_called["sales_rep"] == rep]
-            customers_called = rep_calls["customer_called"].nunique()
-            order_value_calls = rep_calls["order_value"].sum()
+        # Calls data
+        calls = df_called.groupby("sales_rep").agg(
+            customers_called=("customer_called", "nunique"),
+            order_value_calls=("order_value", "sum"),
+        )
 
-            summary_rows.append({
-                "SALESPERSON": rep,
-                "CUSTOMERS VISITED": customers_visited,
-                "ORDER VALUE FROM VISITS": order_value_visits,
-                "CUSTOMERS CALLED": customers_called,
-                "ORDER VALUE FROM CALLS": order_value_calls
-            })
+        summary = pd.DataFrame(index=pd.Index(reps, name="SALESPERSON"))
+        summary["CUSTOMERS VISITED"] = visits["customers_visited"].reindex(reps, fill_value=0).to_numpy()
+        summary["ORDER VALUE FROM VISITS"] = visits["order_value_visits"].reindex(reps, fill_value=0.0).to_numpy()
+        summary["CUSTOMERS CALLED"] = calls["customers_called"].reindex(reps, fill_value=0).to_numpy()
+        summary["ORDER VALUE FROM CALLS"] = calls["order_value_calls"].reindex(reps, fill_value=0.0).to_numpy()
 
-        return pd.DataFrame(summary_rows)
+        return summary.reset_index()
 
     @staticmethod
     def export_summary_text(df_summary: pd.DataFrame, filepath: str) -> None:
@@ -383,24 +539,44 @@ class SummaryGenerator:
 
         # Format numbers with commas
         summary_for_email["ORDER VALUE FROM VISITS"] = \
-            summary_for_email["ORDER VALUE FROM VISITS"].map("{:,.2f}".format)
+            summary_for_email["ORDER VALUE FROM VISITS"].map(_MONEY_FORMAT)
         summary_for_email["ORDER VALUE FROM CALLS"] = \
-            summary_for_email["ORDER VALUE FROM CALLS"].map("{:,.2f}".format)
+            summary_for_email["ORDER VALUE FROM CALLS"].map(_MONEY_FORMAT)
 
         with open(filepath, "w") as f:
             f.write(summary_for_email.to_string(index=False))
 
         logger.info(f"✅ Summary text saved: {filepath}")
 
+    @staticmethod
+    def export_summary_csv(df_summary: pd.DataFrame, filepath: str) -> None:
+        """Export summary as CSV (raw values, for loading into other tools)."""
+        df_summary.to_csv(filepath, index=False)
+        logger.info(f"✅ Summary CSV saved: {filepath}")
+
     @staticmethod
     def export_summary_image(df_summary: pd.DataFrame, filepath: str) -> None:
-        """Export summary as image (optional)."""
-        if not HAS_DFI:
-            logger.warning("dataframe_image not available, skipping image export")
+        """Export summary as image (optional), drawn with matplotlib's table primitive."""
+        if not HAS_MPL:
+            logger.warning("matplotlib not available, skipping image export")
             return
 
         try:
-            dfi.export(df_summary, filepath)
+            n_rows, n_cols = df_summary.shape
+            fig, ax = plt.subplots(figsize=(max(6, 2.2 * n_cols), 0.4 * (n_rows + 1) + 0.5))
+            try:
+                ax.axis("off")
+                table = ax.table(
+                    cellText=df_summary.astype(str).values,
+                    colLabels=list(df_summary.columns),
+                    loc="center",
+                )
+                table.auto_set_font_size(False)
+                table.set_fontsize(9)
+                table.auto_set_column_width(list(range(n_cols)))
+                fig.savefig(filepath, dpi=150, bbox_inches="tight")
+            finally:
+                plt.close(fig)
             logger.info(f"✅ Summary image saved: {filepath}")
         except Exception as e:
             logger.error(f"Failed to export summary image: {e}")
@@ -410,76 +586,143 @@ class SummaryGenerator:
 # REP SHEET GENERATOR
 # ============================================================================
 
+# Cell values of one sheet row, with one named style for the row or one per cell
+SheetRow = Tuple[List[Any], str | List[str]]
+
+
+# Characters replaced with "_" when a rep name is used as a file name
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w-]+")
+
+
+@dataclass
+class RepSheetData:
+    """A rep sheet built ahead of writing: row values and styles, heights and merges."""
+    sheet_name: str
+    csv_name: str
+    rows: List[SheetRow]
+    heights: List[float]
+    merged_rows: List[int]
+
+
 class RepSheetGenerator:
     """Generates individual sales rep sheets."""
 
-    def __init__(self, access_token: str, config: ReportConfig):
-        self.access_token = access_token
-        self.config = config
+    PRODUCT_HEADER = ["Product ID", "Product Description", "", "Sold Qty", "Unit Cost", "Order Value", ""]
 
-        # Initialize fill patterns
-        self.customer_fill = PatternFill(
-            start_color=config.customer_fill_color,
-            end_color=config.customer_fill_color,
-            fill_type="solid"
-        )
-        self.product_header_fill = PatternFill(
-            start_color=config.product_header_color,
-            end_color=config.product_header_color,
-            fill_type="solid"
-        )
+    COLUMN_WIDTHS = {
+        1: 45,  # Column A: Customer Name with visit type (wider)
+        2: 40,  # Column B: Time Spent / Product Description (wider for long descriptions)
+        3: 20,  # Column C: Extra space
+        4: 15,  # Column D: Sold Qty
+        5: 15,  # Column E: Unit Cost
+        6: 18,  # Column F: Order Value
+        7: 10,  # Column G: Empty column
+    }
+
+    def __init__(self, config: ReportConfig):
+        self.config = config
+        self.styler = ExcelStyler(config)
+        # CSV names handed out so far, lower-cased for case-insensitive
+        # filesystems; "summary" is taken by Summary.csv
+        self._csv_names: Set[str] = {"summary"}
 
     def create_rep_sheet(
         self,
-        writer: pd.ExcelWriter,
+        workbook: Workbook,
         rep: str,
-        df_final: pd.DataFrame,
-        df_called: pd.DataFrame,
-        orders_data: List[Dict]
+        rep_visits: pd.DataFrame,
+        rep_calls: pd.DataFrame,
+        rep_orders: List[Dict],
+        order_details: Dict[Any, Dict]
     ) -> None:
-        """Create a complete sheet for a sales rep."""
+        """Create a complete sheet for a sales rep from that rep's own rows."""
         logger.info(f"  Processing: {rep}")
 
+        sheet = self.build_rep_sheet(rep, rep_visits, rep_calls, rep_orders, order_details)
+        self.write_rep_sheet(workbook, sheet)
+
+        if self.config.csv_dir:
+            self.write_rep_csv(sheet, self.config.csv_dir)
+
+    def build_rep_sheet(
+        self,
+        rep: str,
+        rep_visits: pd.DataFrame,
+        rep_calls: pd.DataFrame,
+        rep_orders: List[Dict],
+        order_details: Dict[Any, Dict]
+    ) -> RepSheetData:
+        """Build the rows of a rep sheet without touching the workbook."""
         # Build customer dictionary
-        rep_visits = df_final[df_final["sales_rep_final"] == rep]
-        rep_calls = df_called[df_called["sales_rep"] == rep]
-        customers = self._build_customer_dict(rep, rep_visits, rep_calls, orders_data)
+        customers = self._build_customer_dict(rep_visits, rep_calls, rep_orders)
 
         # Create sheet name
         sheet_name = rep.replace(".", "_").replace(" ", "_")[:31]
 
-        # Create empty worksheet
-        writer.book.create_sheet(sheet_name)
-        ws = writer.book[sheet_name]
+        # CSV files have no 31-character limit, so use the full name to keep
+        # reps sharing a long prefix in separate files
+        csv_name = self._unique_csv_name(_UNSAFE_FILENAME_CHARS.sub("_", rep) or "rep")
+
+        rows, merged_rows = self._build_rep_rows(customers, order_details)
+        heights = self.styler.fit_row_heights([values for values, _ in rows], self.COLUMN_WIDTHS)
+
+        return RepSheetData(sheet_name, csv_name, rows, heights, merged_rows)
+
+    def write_rep_sheet(self, workbook: Workbook, sheet: RepSheetData) -> None:
+        """Stream a built rep sheet into the workbook."""
+        # Create empty worksheet; column widths must be set before rows are streamed
+        ws = workbook.create_sheet(sheet.sheet_name)
+        self.styler.set_column_widths(ws, self.COLUMN_WIDTHS)
+
+        for row_idx, ((values, style), height) in enumerate(zip(sheet.rows, sheet.heights), start=1):
+            styles = [style] * len(values) if isinstance(style, str) else style
+            self.styler.append_styled_row(ws, row_idx, values, styles, height)
 
-        # Write data with styling
-        self._write_rep_data(ws, customers, rep)
+        for row_idx in sheet.merged_rows:
+            ws.merged_cells.add(f"A{row_idx}:G{row_idx}")
 
-        # Apply general styling (column widths and row heights)
-        self._adjust_column_widths_and_heights(ws)
+    def _unique_csv_name(self, name: str) -> str:
+        """Reserve a CSV file name, adding _2, _3, ... if it is already taken."""
+        candidate = name
+        suffix = 1
+        while candidate.lower() in self._csv_names:
+            suffix += 1
+            candidate = f"{name}_{suffix}"
+        self._csv_names.add(candidate.lower())
+        return candidate
+
+    @staticmethod
+    def write_rep_csv(sheet: RepSheetData, csv_dir: str) -> None:
+        """Write a built rep sheet's values to <csv_dir>/<rep name>.csv."""
+        filepath = os.path.join(csv_dir, f"{sheet.csv_name}.csv")
+        with open(filepath, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(values for values, _ in sheet.rows)
 
     def _build_customer_dict(
         self,
-        rep: str,
         rep_visits: pd.DataFrame,
         rep_calls: pd.DataFrame,
-        orders_data: List[Dict]
+        rep_orders: List[Dict]
     ) -> Dict[str, Dict]:
         """Build dictionary of customer information."""
         customers = {}
 
+        if rep_visits.empty and rep_calls.empty and not rep_orders:
+            return customers
+
         # Add visits
-        for _, visit in rep_visits.iterrows():
-            cust = visit["customer_name_final"]
+        for cust, time_spent in zip(
+            rep_visits["customer_name_final"].to_numpy(),
+            rep_visits["time_spent"].to_numpy()
+        ):
             customers[cust] = {
                 "visit_type": "Visited",
-                "time_spent": visit.get("time_spent", ""),
+                "time_spent": time_spent,
                 "orders": [],
             }
 
         # Add calls
-        for _, call in rep_calls.iterrows():
-            cust = call["customer_called"]
+        for cust in rep_calls["customer_called"].to_numpy():
             customers.setdefault(
                 cust,
                 {"visit_type": "Called", "time_spent": "", "orders": []},
@@ -488,10 +731,7 @@ class RepSheetGenerator:
                 customers[cust]["visit_type"] = "Visited & Called"
 
         # Add orders
-        for order in orders_data:
-            if order.get("sales_rep") != rep:
-                continue
-
+        for order in rep_orders:
             cust = order.get("customer_name")
             if not cust:
                 continue
@@ -504,18 +744,14 @@ class RepSheetGenerator:
 
         return customers
 
-    def _write_rep_data(self, ws: Worksheet, customers: Dict[str, Dict], rep: str) -> None:
-        """Write customer data to worksheet with styling."""
-        row_idx = 1
-        wrap_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
-
-        # Define border style
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+    def _build_rep_rows(
+        self,
+        customers: Dict[str, Dict],
+        order_details: Dict[Any, Dict]
+    ) -> Tuple[List[SheetRow], List[int]]:
+        """Build the styled rows for each customer, plus the rows to merge."""
+        rows: List[SheetRow] = []
+        merged_rows: List[int] = []
 
         for cust_name, info in customers.items():
             # Format customer name with visit type in brackets
@@ -529,9 +765,6 @@ class RepSheetGenerator:
             else:
                 customer_display = cust_name
 
-            # Customer header row - write values first
-            ws.cell(row=row_idx, column=1, value=customer_display)
-
             # Format time spent
             time_spent = info["time_spent"]
             if time_spent and visit_type in ["Visited", "Visited & Called"]:
@@ -539,182 +772,68 @@ class RepSheetGenerator:
             else:
                 time_display = ""
 
-            ws.cell(row=row_idx, column=2, value=time_display)
-            ws.cell(row=row_idx, column=3, value="")
-            ws.cell(row=row_idx, column=4, value="")
-            ws.cell(row=row_idx, column=5, value="")
-            ws.cell(row=row_idx, column=6, value="")
-            ws.cell(row=row_idx, column=7, value="")
-
-            # Style customer header with Times New Roman font, wrap text, and borders
-            for col_idx in range(1, 8):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                cell.fill = self.customer_fill
-                cell.font = Font(
-                    name=self.config.body_font_name,
-                    size=self.config.body_font_size,
-                    bold=True
-                )
-                cell.alignment = wrap_align
-                cell.border = thin_border
-
-            row_idx += 1
+            # Customer header row
+            rows.append((
+                [customer_display, time_display, "", "", "", "", ""],
+                ExcelStyler.CUSTOMER_STYLE
+            ))
 
-            # Fetch and add order items
-            all_items = self._fetch_order_items(info["orders"], rep)
+            # Add order items
+            all_items = self._collect_order_items(info["orders"], order_details)
 
             if all_items:
                 # Product table header row
-                ws.cell(row=row_idx, column=1, value="Product ID")
-                ws.cell(row=row_idx, column=2, value="Product Description")
-                ws.cell(row=row_idx, column=3, value="")
-                ws.cell(row=row_idx, column=4, value="Sold Qty")
-                ws.cell(row=row_idx, column=5, value="Unit Cost")
-                ws.cell(row=row_idx, column=6, value="Order Value")
-                ws.cell(row=row_idx, column=7, value="")
-
-                # Style product header with Times New Roman font, wrap text, and borders
-                for col_idx in range(1, 8):
-                    cell = ws.cell(row=row_idx, column=col_idx)
-                    cell.fill = self.product_header_fill
-                    cell.font = Font(
-                        name=self.config.body_font_name,
-                        size=self.config.body_font_size,
-                        bold=True,
-                        color="FFFFFF"
-                    )
-                    cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                    cell.border = thin_border
-
-                row_idx += 1
-
-                # Add product rows with Times New Roman font, wrap text, and borders
-                for item in all_items:
-                    qty = float(item.get("sold_qty", 0))
-                    cost = float(item.get("unit_cost", 0))
-
-                    # Clean product description - remove "ID - " prefix
-                    product_desc = item.get("product_desc", "")
-                    product_id = str(item.get("product_id", ""))
-
-                    # Remove product ID prefix if it exists
-                    if product_desc and product_id:
-                        prefix = f"{product_id} - "
-                        if product_desc.startswith(prefix):
-                            product_desc = product_desc[len(prefix):]
-
-                    ws.cell(row=row_idx, column=1, value=product_id)
-                    ws.cell(row=row_idx, column=2, value=product_desc)
-                    ws.cell(row=row_idx, column=3, value="")
-                    ws.cell(row=row_idx, column=4, value=qty)
-                    ws.cell(row=row_idx, column=5, value=cost)
-                    ws.cell(row=row_idx, column=6, value=f"{qty * cost:,.2f}")
-                    ws.cell(row=row_idx, column=7, value="")
-
-                    # Apply Times New Roman font, wrap text, and borders to product rows
-                    for col_idx in range(1, 8):
-                        cell = ws.cell(row=row_idx, column=col_idx)
-                        cell.font = Font(
-                            name=self.config.body_font_name,
-                            size=self.config.body_font_size
-                        )
-                        cell.alignment = wrap_align
-                        cell.border = thin_border
-
-                    row_idx += 1
-            else:
-                # No orders - set value FIRST, then merge
-                no_orders_cell = ws.cell(row=row_idx, column=1)
-                no_orders_cell.value = "No orders"
-                no_orders_cell.font = Font(
-                    name=self.config.body_font_name,
-                    size=self.config.body_font_size,
-                    color=self.config.error_color,
-                    bold=True
-                )
-                no_orders_cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                no_orders_cell.border = thin_border
-
-                # Apply borders to all cells before merging
-                for col_idx in range(1, 8):
-                    cell = ws.cell(row=row_idx, column=col_idx)
-                    cell.border = thin_border
-
-                # Now merge cells
-                ws.merge_cells(
-                    start_row=row_idx,
-                    start_column=1,
-                    end_row=row_idx,
-                    end_column=7
-                )
+                rows.append((self.PRODUCT_HEADER, ExcelStyler.PRODUCT_HEADER_STYLE))
 
-                row_idx += 1
+                # Add product rows
+                rows.extend(
+                    (product_row, ExcelStyler.PRODUCT_STYLE)
+                    for product_row in self._product_rows(all_items)
+                )
+            else:
+                # No orders - bordered cells merged across the table
+                rows.append((
+                    ["No orders", None, None, None, None, None, None],
+                    [ExcelStyler.NO_ORDERS_STYLE] + [ExcelStyler.GRID_STYLE] * 6
+                ))
+                merged_rows.append(len(rows))
 
             # Empty separator row - add borders to maintain grid
-            for col_idx in range(1, 8):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                cell.border = thin_border
+            rows.append(([None] * 7, ExcelStyler.GRID_STYLE))
 
-            row_idx += 1
+        return rows, merged_rows
 
-    def _fetch_order_items(self, order_ids: List[int], rep: str) -> List[Dict]:
-        """Fetch items for all order IDs."""
+    @staticmethod
+    def _product_rows(items: List[Dict]) -> List[List[Any]]:
+        """Build the product table rows for a customer's order items."""
+        product_ids = [str(item.get("product_id", "")) for item in items]
+        quantities = [float(item.get("sold_qty", 0)) for item in items]
+        costs = [float(item.get("unit_cost", 0)) for item in items]
+        order_values = list(map(_MONEY_FORMAT, map(operator.mul, quantities, costs)))
+
+        rows = []
+        for item, product_id, qty, cost, order_value in zip(items, product_ids, quantities, costs, order_values):
+            # Clean product description - remove "ID - " prefix
+            product_desc = item.get("product_desc", "")
+            if product_desc and product_id:
+                product_desc = product_desc.removeprefix(f"{product_id} - ")
+
+            rows.append([product_id, product_desc, "", qty, cost, order_value, ""])
+
+        return rows
+
+    def _collect_order_items(self, order_ids: List[int], order_details: Dict[Any, Dict]) -> List[Dict]:
+        """Collect items for all order IDs from the prefetched order details."""
         all_items = []
 
         for order_id in order_ids:
-            try:
-                details = get_order_details(self.access_token, order_id)
+            # Failed fetches were already logged - just skip them
+            details = order_details.get(order_id)
+            if details:
                 all_items.extend(details.get("entries", []))
-            except Exception as e:
-                logger.error(f"Error fetching order {order_id} for {rep}: {e}")
-                # Don't add error rows - just log and continue
 
         return all_items
 
-    def _adjust_column_widths_and_heights(self, ws: Worksheet) -> None:
-        """Set wider column widths and calculate row heights for rep sheet."""
-        column_widths = {
-            1: 45,  # Column A: Customer Name with visit type (wider)
-            2: 40,  # Column B: Time Spent / Product Description (wider for long descriptions)
-            3: 20,  # Column C: Extra space
-            4: 15,  # Column D: Sold Qty
-            5: 15,  # Column E: Unit Cost
-            6: 18,  # Column F: Order Value
-            7: 10,  # Column G: Empty column
-        }
-
-        # Set column widths
-        for col_idx, width in column_widths.items():
-            col_letter = get_column_letter(col_idx)
-            ws.column_dimensions[col_letter].width = width
-
-        # Calculate and set row heights for all rows
-        styler = ExcelStyler(self.config)
-        for row_idx in range(1, ws.max_row + 1):
-            max_height = 18  # Default minimum height (increased from 15)
-
-            for col_idx in range(1, 8):  # We have 7 columns
-                cell = ws.cell(row=row_idx, column=col_idx)
-                cell_value = cell.value
-
-                # Skip empty cells
-                if cell_value is None or (isinstance(cell_value, str) and not cell_value.strip()):
-                    continue
-
-                # Get column width for this column
-                col_width = column_widths.get(col_idx, 20)
-
-                # Calculate required height
-                try:
-                    height = styler.calculate_row_height(cell_value, col_width, self.config.body_font_size)
-                    max_height = max(max_height, height)
-                except Exception as e:
-                    logger.warning(f"Could not calculate height for row {row_idx}, col {col_idx}: {e}")
-                    max_height = max(max_height, 35)  # Fallback to larger height
-
-            # Set the row height with extra padding for readability
-            ws.row_dimensions[row_idx].height = max_height
-
 
 # ============================================================================
 # MAIN REPORT GENERATOR
@@ -724,7 +843,7 @@ def generate_detailed_report(
     visits_data: List[Dict],
     orders_data: List[Dict],
     config: ReportConfig = None
-) -> None:
+) -> pd.DataFrame:
     """
     Generate detailed CSFA report with visits and orders.
 
@@ -732,6 +851,10 @@ def generate_detailed_report(
         visits_data: List of visit records
         orders_data: List of order records
         config: Optional configuration object
+
+    Returns:
+        The summary table written to the Summary sheet, so callers can
+        reuse it without reading the workbook back
     """
     if config is None:
         config = ReportConfig.from_env()
@@ -751,7 +874,26 @@ def generate_detailed_report(
     processor = DataProcessor()
     styler = ExcelStyler(config)
     summary_gen = SummaryGenerator()
-    rep_gen = RepSheetGenerator(access_token, config)
+    rep_gen = RepSheetGenerator(config)
+
+    if not visits_data and not orders_data:
+        # Nothing to process or fetch - the report is an empty summary
+        logger.info("No visits or orders found, writing an empty summary")
+        df_summary = pd.DataFrame(columns=SummaryGenerator.COLUMNS)
+
+        workbook = Workbook(write_only=True)
+        styler.register_named_styles(workbook)
+        styler.write_summary_sheet(workbook.create_sheet("Summary"), df_summary)
+        workbook.save(config.output_file)
+
+        summary_gen.export_summary_text(df_summary, config.summary_text_file)
+        summary_gen.export_summary_image(df_summary, config.summary_image_file)
+        if config.csv_dir:
+            os.makedirs(config.csv_dir, exist_ok=True)
+            summary_gen.export_summary_csv(df_summary, os.path.join(config.csv_dir, "Summary.csv"))
+
+        logger.info(f"✅ Report generation complete: {config.output_file}")
+        return df_summary
 
     # Process data
     logger.info("📊 Processing data...")
@@ -763,21 +905,79 @@ def generate_detailed_report(
 
     logger.info(f"Found {len(reps)} sales representatives")
 
-    # Generate summary
-    df_summary = summary_gen.generate_summary(reps, df_final, df_called)
+    # Group orders by rep once instead of filtering for every rep sheet
+    orders_by_rep = defaultdict(list)
+    for order in orders_data:
+        orders_by_rep[order.get("sales_rep")].append(order)
+
+    # Start fetching details in one concurrent batch, so the API round-trips
+    # overlap the summary and workbook work below. Only orders that appear
+    # on a rep sheet are fetched.
+    logger.info("📦 Fetching order details in the background...")
+    order_ids = [
+        order.get("id")
+        for rep in reps
+        for order in orders_by_rep.get(rep, [])
+        if order.get("customer_name")
+    ]
+    stop_prefetch = threading.Event()
+    prefetch = ThreadPoolExecutor(max_workers=1)
+    details_future = prefetch.submit(
+        get_order_details_many, access_token, order_ids, stop=stop_prefetch
+    )
+
+    try:
+        visits_by_rep = dict(tuple(df_final.groupby("sales_rep_final", sort=False)))
+        calls_by_rep = dict(tuple(df_called.groupby("sales_rep", sort=False)))
+
+        # Generate summary
+        df_summary = summary_gen.generate_summary(reps, df_final, df_called)
+
+        # The per-rep groups are copies, so the full frames are no longer needed;
+        # free them before the workbook is written to keep peak memory down
+        no_visits = df_final.iloc[0:0]
+        no_calls = df_called.iloc[0:0]
+        del df_visits, df_orders, df_final, df_called
+        gc.collect()
+
+        # Create Excel file
+        logger.info("📝 Creating Excel file...")
+        if config.csv_dir:
+            os.makedirs(config.csv_dir, exist_ok=True)
+            summary_gen.export_summary_csv(df_summary, os.path.join(config.csv_dir, "Summary.csv"))
+
+        # Write-only mode streams each row to disk instead of keeping every
+        # cell of every sheet in memory until save
+        workbook = Workbook(write_only=True)
+        styler.register_named_styles(workbook)
 
-    # Create Excel file
-    logger.info("📝 Creating Excel file...")
-    with pd.ExcelWriter(config.output_file, engine="openpyxl") as writer:
         # Write summary sheet with special styling
-        df_summary.to_excel(writer, index=False, sheet_name="Summary")
-        ws = writer.sheets["Summary"]
-        styler.apply_summary_styling(ws)  # Use summary-specific styling
-        styler.format_money_columns(ws, [2, 4])  # Order value columns
+        ws = workbook.create_sheet("Summary")
+        styler.write_summary_sheet(ws, df_summary)
+
+        order_details = details_future.result()
+    except BaseException:
+        # Raise right away: orders not yet requested are skipped, and only
+        # the requests already in flight finish in the background
+        stop_prefetch.set()
+        raise
+    finally:
+        prefetch.shutdown(wait=False, cancel_futures=True)
+
+    logger.info(f"✅ Fetched details for {len(order_details)} orders")
+
+    # Write individual rep sheets
+    for rep in reps:
+        rep_gen.create_rep_sheet(
+            workbook,
+            rep,
+            visits_by_rep.get(rep, no_visits),
+            calls_by_rep.get(rep, no_calls),
+            orders_by_rep.get(rep, []),
+            order_details
+        )
 
-        # Write individual rep sheets
-        for rep in reps:
-            rep_gen.create_rep_sheet(writer, rep, df_final, df_called, orders_data)
+    workbook.save(config.output_file)
 
     # Export summary files
     summary_gen.export_summary_text(df_summary, config.summary_text_file)
@@ -785,6 +985,8 @@ def generate_detailed_report(
 
     logger.info(f"✅ Report generation complete: {config.output_file}")
 
+    return df_summary
+
 
 # ============================================================================
 # EXAMPLE USAGE
@@ -11,9 +11,9 @@ from typing import Dict, List, Tuple
 from dotenv import load_dotenv
 
 # Import local modules
-from api_client import get_orders, get_timesheet, get_order_details
+from api_client import get_orders, get_timesheet, close_session
 from generate_detailed_report import generate_detailed_report, ReportConfig
-from send_report import send_report
+from send_report import send_report, close_smtp
 
 # Load environment variables
 load_dotenv()
@@ -291,12 +291,12 @@ def generate_and_send_report() -> bool:
         # Generate report
         logger.info("\n📊 Generating detailed Excel report...")
         report_config = ReportConfig.from_env()
-        generate_detailed_report(visits_data, orders_data, report_config)
+        df_summary = generate_detailed_report(visits_data, orders_data, report_config)
 
         # Send email (if configured)
         if Config.SEND_EMAIL:
             logger.info("\n📧 Sending email report...")
-            email_success = send_report(date_str=display_date)
+            email_success = send_report(date_str=display_date, summary_df=df_summary)
             if not email_success:
                 logger.warning("⚠️ Email sending failed, but report was generated")
         else:
@@ -346,6 +346,8 @@ def main() -> int:
         logger.error(f"\n❌ Unexpected error: {e}", exc_info=True)
         return 1
     finally:
+        close_session()
+        close_smtp()
         logger.info(f"\nFinished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         logger.info("=" * 70)
 
@@ -4,20 +4,76 @@ Sends daily reports with professional formatting and error handling.
 """
 
 import os
+import gzip
+import hashlib
 import smtplib
 import logging
+import tempfile
+import threading
 from email.message import EmailMessage
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional
 from pathlib import Path
 import mimetypes
+from concurrent.futures import Future, ThreadPoolExecutor
+from string import Template
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
+# Optional: python-calamine (Rust) reads the summary sheet faster than openpyxl
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Thousands-separated, two-decimal money text (e.g. "1,234.50")
+_MONEY_FORMAT = "{:,.2f}".format
+
+# Thousands-separated whole number text (e.g. "1,234")
+_COUNT_FORMAT = "{:,}".format
+
+
+@lru_cache(maxsize=64)
+def _guess_content_type(suffix: str) -> str:
+    """MIME type for a file extension, falling back to octet-stream."""
+    ctype, encoding = mimetypes.guess_type("attachment" + suffix)
+    if ctype is None or encoding is not None:
+        ctype = "application/octet-stream"
+    return ctype
+
+
+# Email summary markup, parsed once at import
+_SUMMARY_TEMPLATE = Template("""
+        $kpi_html
+        <h3 style="color: #4F81BD; margin-top: 30px;">Detailed Performance by Salesperson</h3>
+        $performance_html
+        """)
+
+_KPI_TEMPLATE = Template("""
+        <div style="margin: 20px 0;">
+            <h3 style="color: #4F81BD; margin-bottom: 15px;">Key Performance Indicators</h3>
+            <table style="border-collapse: collapse; width: 100%; margin-bottom: 20px;">
+                <tr>
+                    <td style="padding: 15px; background-color: #E8F4F8; border: 2px solid #4F81BD; width: 50%; text-align: center;">
+                        <div style="font-size: 14px; color: #666; margin-bottom: 5px;">TOTAL CUSTOMERS (Visited & Called)</div>
+                        <div style="font-size: 28px; font-weight: bold; color: #4F81BD;">$total_customers_str</div>
+                    </td>
+                    <td style="padding: 15px; background-color: #E8F4F8; border: 2px solid #4F81BD; width: 50%; text-align: center;">
+                        <div style="font-size: 14px; color: #666; margin-bottom: 5px;">TOTAL ORDER REVENUE</div>
+                        <div style="font-size: 28px; font-weight: bold; color: #4F81BD;">$total_revenue_str</div>
+                    </td>
+                </tr>
+            </table>
+        </div>
+        """)
+
 
 # ============================================================================
 # EMAIL CONFIGURATION
@@ -37,6 +93,11 @@ class EmailConfig:
     CC_RECIPIENTS = os.getenv("EMAIL_CC", "daniel.ndirangu@robbialac.co.mz,isaac.mokua@robbialac.co.mz").split(",")
     BCC_RECIPIENTS = os.getenv("EMAIL_BCC", "").split(",") if os.getenv("EMAIL_BCC") else []
 
+    # Cleaned header values, built once since the recipients are fixed per process
+    TO_HEADER = ", ".join(r.strip() for r in TO_RECIPIENTS if r.strip())
+    CC_HEADER = ", ".join(r.strip() for r in CC_RECIPIENTS if r.strip())
+    BCC_HEADER = ", ".join(r.strip() for r in BCC_RECIPIENTS if r.strip())
+
     # Email content
     EMAIL_SUBJECT_TEMPLATE = os.getenv("EMAIL_SUBJECT", "Tintas Berger CSFA Report - {date}")
     SENDER_NAME = os.getenv("SENDER_NAME", "Innocent Maina")
@@ -49,6 +110,17 @@ class EmailConfig:
     # SMTP timeout
     SMTP_TIMEOUT = int(os.getenv("SMTP_TIMEOUT", "30"))
 
+    # Gzip text attachments (CSV, HTML, plain text) before attaching
+    COMPRESS_TEXT_ATTACHMENTS = os.getenv("COMPRESS_TEXT_ATTACHMENTS", "false").lower() == "true"
+
+    # Report display and debug flags
+    REPORT_CURRENCY = os.getenv("REPORT_CURRENCY", "MZN")
+    SAVE_HTML_PREVIEW = os.getenv("SAVE_HTML_PREVIEW", "").lower() == "true"
+    DEBUG = os.getenv("DEBUG", "").lower() == "true"
+
+    # Directory for cached summary HTML of standalone sends (empty = disabled)
+    SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", "").strip()
+
     @classmethod
     def validate(cls) -> None:
         """Validate required configuration."""
@@ -100,6 +172,16 @@ class HTMLTableGenerator:
 
     ALT_ROW_STYLE = "background-color: #f9f9f9;"
 
+    # Per-alignment cell openers, built once rather than per column
+    CELL_STYLE_LEFT = CELL_STYLE + " text-align: left;"
+    CELL_STYLE_RIGHT = CELL_STYLE + " text-align: right;"
+    CELL_OPEN_LEFT = f'<td style="{CELL_STYLE_LEFT}">'
+    CELL_OPEN_RIGHT = f'<td style="{CELL_STYLE_RIGHT}">'
+
+    COUNT_COLUMNS = ('CUSTOMERS VISITED', 'CUSTOMERS CALLED')
+    MONEY_COLUMNS = ('ORDER VALUE FROM VISITS', 'ORDER VALUE FROM CALLS')
+    NUMERIC_COLUMNS = frozenset(COUNT_COLUMNS + MONEY_COLUMNS)
+
     @classmethod
     def generate(cls, df: pd.DataFrame, format_money: bool = True) -> str:
         """
@@ -115,50 +197,51 @@ class HTMLTableGenerator:
         if df.empty:
             return "<p><em>No data available</em></p>"
 
-        # Format display for specific columns
-        df_formatted = df.copy()
+        # Display values per column; only the formatted columns are replaced,
+        # so the frame itself is never copied
+        cells = {col: df[col] for col in df.columns}
 
         # Format customer count columns as integers (no decimals)
-        customer_columns = ['CUSTOMERS VISITED', 'CUSTOMERS CALLED']
-        for col in customer_columns:
-            if col in df_formatted.columns:
-                df_formatted[col] = df_formatted[col].apply(
-                    lambda x: f"{int(x):,}" if pd.notnull(x) else ""
+        # (cast to int64 once per column rather than int() per cell)
+        for col in cls.COUNT_COLUMNS:
+            if col in cells:
+                counts = cells[col]
+                present = counts.notna()
+                cells[col] = (
+                    counts[present].astype("int64").map(_COUNT_FORMAT)
+                    .reindex(counts.index, fill_value="")
                 )
 
         # Format money columns
         if format_money:
-            money_columns = ['ORDER VALUE FROM VISITS', 'ORDER VALUE FROM CALLS']
-            for col in money_columns:
-                if col in df_formatted.columns:
-                    df_formatted[col] = df_formatted[col].apply(
-                        lambda x: f"{x:,.2f}" if pd.notnull(x) else ""
-                    )
+            for col in cls.MONEY_COLUMNS:
+                if col in cells:
+                    cells[col] = cells[col].map(_MONEY_FORMAT, na_action="ignore").fillna("")
 
-        # Build HTML table
-        html = f'<table style="{cls.TABLE_STYLE}">'
-
-        # Header row
-        html += '<thead><tr>'
-        for col in df_formatted.columns:
-            html += f'<th style="{cls.HEADER_STYLE}">{col}</th>'
-        html += '</tr></thead>'
+        # Cell HTML is built a whole column at a time; numbers are right-aligned
+        row_html = pd.Series("", index=df.index, dtype=object)
+        for col, values in cells.items():
+            cell_open = cls.CELL_OPEN_RIGHT if col in cls.NUMERIC_COLUMNS else cls.CELL_OPEN_LEFT
+            row_html = row_html + cell_open + values.astype(str) + "</td>"
 
         # Data rows with alternating colors
-        html += '<tbody>'
-        for idx, row in df_formatted.iterrows():
-            row_style = cls.ALT_ROW_STYLE if idx % 2 == 1 else ""
-            html += f'<tr style="{row_style}">'
-            for col in df_formatted.columns:
-                value = row[col]
-                # Right-align numbers
-                is_numeric = col in customer_columns or col in money_columns
-                align = "right" if is_numeric else "left"
-                cell_style = cls.CELL_STYLE + f" text-align: {align};"
-                html += f'<td style="{cell_style}">{value}</td>'
-            html += '</tr>'
-        html += '</tbody>'
-        html += '</table>'
+        row_open = np.where(
+            np.asarray(df.index) % 2 == 1,
+            f'<tr style="{cls.ALT_ROW_STYLE}">',
+            '<tr style="">'
+        )
+
+        header_html = "".join(f'<th style="{cls.HEADER_STYLE}">{col}</th>' for col in df.columns)
+
+        # Build HTML table
+        html = "".join([
+            f'<table style="{cls.TABLE_STYLE}">',
+            f"<thead><tr>{header_html}</tr></thead>",
+            "<tbody>",
+            "".join(row_open + row_html.to_numpy() + "</tr>"),
+            "</tbody>",
+            "</table>",
+        ])
 
         return html
 
@@ -170,6 +253,48 @@ class HTMLTableGenerator:
 class EmailBuilder:
     """Build email messages with attachments."""
 
+    # Static body markup, parsed once; only the slots vary per message
+    BODY_TEMPLATE = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    line-height: 1.6;
+                    color: #333;
+                }
+                .header {
+                    color: #4F81BD;
+                    margin-bottom: 20px;
+                }
+                .footer {
+                    margin-top: 30px;
+                    color: #666;
+                    font-size: 0.9em;
+                }
+            </style>
+        </head>
+        <body>
+            <p>Greetings $recipient_name,</p>
+
+            <p>Please find attached the daily Tintas Berger CSFA report for <strong>$formatted_date</strong>.</p>
+
+            $summary_html
+
+            <p>The complete detailed report is attached as an Excel file.</p>
+
+            <div class="footer">
+                <p>Kind regards,<br>
+                <strong>$sender_name</strong></p>
+
+                <p><em>This is an automated report sent at $current_time on $formatted_date.</em></p>
+            </div>
+        </body>
+        </html>
+        """)
+
     def __init__(self, config: EmailConfig):
         self.config = config
 
@@ -194,15 +319,13 @@ class EmailBuilder:
 
         # Set headers
         msg["From"] = self.config.SENDER_EMAIL
-        msg["To"] = ", ".join(self.config.clean_recipients(self.config.TO_RECIPIENTS))
+        msg["To"] = self.config.TO_HEADER
 
-        cc_recipients = self.config.clean_recipients(self.config.CC_RECIPIENTS)
-        if cc_recipients:
-            msg["Cc"] = ", ".join(cc_recipients)
+        if self.config.CC_HEADER:
+            msg["Cc"] = self.config.CC_HEADER
 
-        bcc_recipients = self.config.clean_recipients(self.config.BCC_RECIPIENTS)
-        if bcc_recipients:
-            msg["Bcc"] = ", ".join(bcc_recipients)
+        if self.config.BCC_HEADER:
+            msg["Bcc"] = self.config.BCC_HEADER
 
         # Set subject
         subject = self.config.EMAIL_SUBJECT_TEMPLATE.format(date=date_str)
@@ -233,70 +356,45 @@ class EmailBuilder:
         # Get current time for automation message
         current_time = datetime.now().strftime("%I:%M %p")
 
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                }}
-                .header {{
-                    color: #4F81BD;
-                    margin-bottom: 20px;
-                }}
-                .footer {{
-                    margin-top: 30px;
-                    color: #666;
-                    font-size: 0.9em;
-                }}
-            </style>
-        </head>
-        <body>
-            <p>Greetings {self.config.RECIPIENT_NAME},</p>
-
-            <p>Please find attached the daily Tintas Berger CSFA report for <strong>{formatted_date}</strong>.</p>
-
-            {summary_html}
-
-            <p>The complete detailed report is attached as an Excel file.</p>
-
-            <div class="footer">
-                <p>Kind regards,<br>
-                <strong>{self.config.SENDER_NAME}</strong></p>
-
-                <p><em>This is an automated report sent at {current_time} on {formatted_date}.</em></p>
-            </div>
-        </body>
-        </html>
-        """
+        return self.BODY_TEMPLATE.substitute(
+            recipient_name=self.config.RECIPIENT_NAME,
+            formatted_date=formatted_date,
+            summary_html=summary_html,
+            sender_name=self.config.SENDER_NAME,
+            current_time=current_time,
+        )
 
     def _attach_file(self, msg: EmailMessage, filepath: str) -> None:
         """Attach a file to the email message."""
-        if not os.path.exists(filepath):
+        filename = os.path.basename(filepath)
+        ctype = _guess_content_type(os.path.splitext(filepath)[1])
+
+        # Text compresses well, unlike .xlsx which is already a zip
+        compress = self.config.COMPRESS_TEXT_ATTACHMENTS and ctype.startswith("text/")
+
+        # Read and attach the file. The email package needs the whole payload
+        # in memory to encode it, so there is nothing to gain from chunking.
+        # A missing file is detected by the open itself rather than a
+        # separate exists check.
+        try:
+            with open(filepath, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
             logger.warning(f"Attachment not found: {filepath}")
             return
+        except Exception as e:
+            logger.error(f"❌ Failed to attach {filepath}: {e}")
+            return
 
-        # Guess MIME type
-        ctype, encoding = mimetypes.guess_type(filepath)
-        if ctype is None or encoding is not None:
-            ctype = "application/octet-stream"
-
-        maintype, subtype = ctype.split("/", 1)
+        if compress:
+            data = gzip.compress(data)
+            ctype = "application/gzip"
+            filename += ".gz"
 
-        # Read and attach file
         try:
-            with open(filepath, "rb") as f:
-                msg.add_attachment(
-                    f.read(),
-                    maintype=maintype,
-                    subtype=subtype,
-                    filename=os.path.basename(filepath)
-                )
-            logger.info(f"✅ Attached: {os.path.basename(filepath)}")
+            maintype, subtype = ctype.split("/", 1)
+            msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=filename)
+            logger.info(f"✅ Attached: {filename}")
         except Exception as e:
             logger.error(f"❌ Failed to attach {filepath}: {e}")
 
@@ -306,10 +404,99 @@ class EmailBuilder:
 # ============================================================================
 
 class EmailSender:
-    """Handle SMTP connection and email sending."""
+    """Handle SMTP connection and email sending.
+
+    The logged-in connection is kept at class level so repeated sends in the
+    same process (e.g. a long-running scheduler) skip the TLS handshake and
+    login. Call close_smtp() when done, or use the sender as a context
+    manager to close the connection on exit:
+
+        with EmailSender(EmailConfig) as sender:
+            for msg in messages:
+                sender.send(msg)
+    """
+
+    _connection: Optional[smtplib.SMTP] = None
 
     def __init__(self, config: EmailConfig):
         self.config = config
+        self._pending_connect: Optional[Future] = None
+
+    def __enter__(self) -> "EmailSender":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.abandon_connect()
+        close_smtp()
+
+    def _connect(self) -> smtplib.SMTP:
+        """Return a live, logged-in SMTP connection, reusing the cached one."""
+        server = EmailSender._connection
+        if server is not None:
+            try:
+                if server.noop()[0] == 250:
+                    logger.info("♻️ Reusing SMTP connection")
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            close_smtp()
+
+        logger.info(f"📧 Connecting to {self.config.SMTP_SERVER}:{self.config.SMTP_PORT}...")
+        server = smtplib.SMTP(
+            self.config.SMTP_SERVER,
+            self.config.SMTP_PORT,
+            timeout=self.config.SMTP_TIMEOUT
+        )
+        try:
+            # Enable debug output in development
+            if self.config.DEBUG:
+                server.set_debuglevel(1)
+
+            # Secure connection
+            server.starttls()
+            logger.info("🔒 TLS enabled")
+
+            # Login
+            server.login(self.config.SENDER_EMAIL, self.config.EMAIL_PASSWORD)
+            logger.info(f"✅ Logged in as {self.config.SENDER_EMAIL}")
+        except Exception:
+            server.close()
+            raise
+
+        EmailSender._connection = server
+        return server
+
+    def connect_in_background(self) -> None:
+        """
+        Start opening the SMTP connection on a worker thread.
+
+        The TLS handshake and login then overlap whatever the caller does
+        before send(), which waits for the connection and reports any
+        connection error as usual.
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_connect = executor.submit(self._connect)
+        executor.shutdown(wait=False)
+
+    def abandon_connect(self) -> None:
+        """
+        Settle a background connect that send() never picked up.
+
+        Cancels the connect if it has not started yet, otherwise waits for it
+        and quits the connection it opened, so a caller bailing out early
+        does not leave a logged-in session behind.
+        """
+        if self._pending_connect is None:
+            return
+        pending, self._pending_connect = self._pending_connect, None
+        if pending.cancel():
+            return
+        try:
+            pending.result()
+        except Exception:
+            # _connect() already closed the socket it failed on
+            return
+        close_smtp()
 
     def send(self, msg: EmailMessage) -> bool:
         """
@@ -322,30 +509,22 @@ class EmailSender:
             True if successful, False otherwise
         """
         try:
-            logger.info(f"📧 Connecting to {self.config.SMTP_SERVER}:{self.config.SMTP_PORT}...")
-
-            with smtplib.SMTP(
-                self.config.SMTP_SERVER,
-                self.config.SMTP_PORT,
-                timeout=self.config.SMTP_TIMEOUT
-            ) as server:
-                # Enable debug output in development
-                if os.getenv("DEBUG", "").lower() == "true":
-                    server.set_debuglevel(1)
-
-                # Secure connection
-                server.starttls()
-                logger.info("🔒 TLS enabled")
-
-                # Login
-                server.login(self.config.SENDER_EMAIL, self.config.EMAIL_PASSWORD)
-                logger.info(f"✅ Logged in as {self.config.SENDER_EMAIL}")
-
-                # Send
+            if self._pending_connect is not None:
+                pending, self._pending_connect = self._pending_connect, None
+                server = pending.result()
+            else:
+                server = self._connect()
+
+            try:
                 server.send_message(msg)
-                logger.info("✅ Email sent successfully!")
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped us between the liveness check and the send
+                logger.warning("⚠️ SMTP connection lost, reconnecting...")
+                close_smtp()
+                self._connect().send_message(msg)
 
-                return True
+            logger.info("✅ Email sent successfully!")
+            return True
 
         except smtplib.SMTPAuthenticationError as e:
             logger.error(f"❌ SMTP Authentication failed: {e}")
@@ -354,18 +533,33 @@ class EmailSender:
 
         except smtplib.SMTPException as e:
             logger.error(f"❌ SMTP Error: {e}")
+            close_smtp()
             return False
 
         except ConnectionError as e:
             logger.error(f"❌ Connection Error: {e}")
             logger.error(f"Cannot connect to {self.config.SMTP_SERVER}:{self.config.SMTP_PORT}")
+            close_smtp()
             return False
 
         except Exception as e:
             logger.error(f"❌ Unexpected error sending email: {e}")
+            close_smtp()
             return False
 
 
+def close_smtp() -> None:
+    """Quit the cached SMTP connection, if one was opened."""
+    server = EmailSender._connection
+    EmailSender._connection = None
+    if server is None:
+        return
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+
 # ============================================================================
 # MAIN REPORT SENDER
 # ============================================================================
@@ -374,7 +568,8 @@ def send_report(
     excel_file: Optional[str] = None,
     summary_sheet: Optional[str] = None,
     date_str: Optional[str] = None,
-    additional_attachments: Optional[List[str]] = None
+    additional_attachments: Optional[List[str]] = None,
+    summary_df: Optional[pd.DataFrame] = None
 ) -> bool:
     """
     Send CSFA report via email.
@@ -384,6 +579,8 @@ def send_report(
         summary_sheet: Name of summary sheet (optional, uses config default)
         date_str: Date string for subject (optional, uses today)
         additional_attachments: Additional files to attach
+        summary_df: Summary table already in memory (optional, otherwise
+            read back from the summary sheet)
 
     Returns:
         True if email sent successfully, False otherwise
@@ -397,112 +594,222 @@ def send_report(
         summary_sheet = summary_sheet or EmailConfig.SUMMARY_SHEET
         date_str = date_str or datetime.now().strftime("%Y-%m-%d")
 
-        logger.info(f"📊 Preparing to send report: {excel_file}")
-
-        # Check if Excel file exists
-        if not os.path.exists(excel_file):
-            logger.error(f"❌ Excel file not found: {excel_file}")
+        # Check if Excel file exists (one stat also gives the size to log)
+        try:
+            excel_stat = os.stat(excel_file)
+        except FileNotFoundError:
+            logger.error("❌ Excel file not found: %s", excel_file)
             return False
 
-        # Read summary sheet
-        logger.info(f"📖 Reading summary from sheet: {summary_sheet}")
+        logger.info("📊 Preparing to send report: %s (%.1f KB)", excel_file, excel_stat.st_size / 1024)
+
+        # Connect to SMTP while the summary is read and the message is built
+        sender = EmailSender(EmailConfig)
+        sender.connect_in_background()
+
         try:
-            df_summary = pd.read_excel(excel_file, sheet_name=summary_sheet)
-        except Exception as e:
-            logger.error(f"❌ Failed to read Excel file: {e}")
-            return False
+            # Build the summary HTML from the caller's table, or from the summary
+            # sheet - reusing a cached render of this exact file when enabled
+            if summary_df is not None:
+                summary_html = _build_summary_html(summary_df)
+            else:
+                cache_file = _summary_cache_file(excel_file, excel_stat, summary_sheet)
+                summary_html = _read_summary_cache(cache_file) if cache_file is not None else None
+                if summary_html is None:
+                    logger.info("📖 Reading summary from sheet: %s", summary_sheet)
+                    try:
+                        df_summary = pd.read_excel(
+                            excel_file,
+                            sheet_name=summary_sheet,
+                            engine="calamine" if HAS_CALAMINE else "openpyxl"
+                        )
+                    except Exception as e:
+                        logger.error("❌ Failed to read Excel file: %s", e)
+                        return False
+
+                    summary_html = _build_summary_html(df_summary)
+                    if cache_file is not None:
+                        _write_summary_cache(cache_file, summary_html)
+
+            # Save HTML preview (optional, for debugging) off the main path; the
+            # thread is not a daemon, so the file is complete before exit
+            if EmailConfig.SAVE_HTML_PREVIEW:
+                threading.Thread(
+                    target=_write_preview,
+                    args=("summary_email_preview.html", summary_html),
+                    name="html-preview"
+                ).start()
+
+            # Collect attachments
+            attachments = [excel_file]
+            if additional_attachments:
+                attachments.extend(additional_attachments)
+
+            # Build email
+            logger.info("✉️ Building email message...")
+            builder = EmailBuilder(EmailConfig)
+            msg = builder.build_message(summary_html, date_str, attachments)
+
+            # Send email
+            success = sender.send(msg)
+
+            if success:
+                logger.info("🎉 Report sent successfully!")
+            else:
+                logger.error("❌ Failed to send report")
+
+            return success
+        finally:
+            # Only does anything when we left before send() used the connect
+            sender.abandon_connect()
 
-        # Generate KPI section
-        logger.info("📈 Calculating KPIs...")
-        kpi_html = _generate_kpi_section(df_summary)
+    except Exception as e:
+        logger.error("❌ Error in send_report: %s", e, exc_info=True)
+        return False
 
-        # Generate detailed performance table
-        logger.info("🎨 Generating performance table...")
-        html_generator = HTMLTableGenerator()
-        performance_html = html_generator.generate(df_summary, format_money=True)
 
-        # Combine sections
-        summary_html = f"""
-        {kpi_html}
-        <h3 style="color: #4F81BD; margin-top: 30px;">Detailed Performance by Salesperson</h3>
-        {performance_html}
-        """
+def _build_summary_html(df_summary: pd.DataFrame) -> str:
+    """Render the KPI section and performance table for the email body."""
+    # Generate KPI section
+    logger.info("📈 Calculating KPIs...")
+    kpi_html = _generate_kpi_section(df_summary)
 
-        # Save HTML preview (optional, for debugging)
-        if os.getenv("SAVE_HTML_PREVIEW", "").lower() == "true":
-            preview_file = "summary_email_preview.html"
-            with open(preview_file, "w", encoding="utf-8") as f:
-                f.write(summary_html)
-            logger.info(f"💾 HTML preview saved: {preview_file}")
+    # Generate detailed performance table
+    logger.info("🎨 Generating performance table...")
+    performance_html = HTMLTableGenerator.generate(df_summary, format_money=True)
 
-        # Collect attachments
-        attachments = [excel_file]
-        if additional_attachments:
-            attachments.extend(additional_attachments)
+    # Combine sections
+    return _SUMMARY_TEMPLATE.substitute(
+        kpi_html=kpi_html,
+        performance_html=performance_html,
+    )
 
-        # Build email
-        logger.info("✉️ Building email message...")
-        builder = EmailBuilder(EmailConfig)
-        msg = builder.build_message(summary_html, date_str, attachments)
 
-        # Send email
-        sender = EmailSender(EmailConfig)
-        success = sender.send(msg)
+def _write_preview(preview_file: str, html: str) -> None:
+    """Write the HTML preview file, logging rather than raising on failure."""
+    try:
+        with open(preview_file, "w", encoding="utf-8") as f:
+            f.write(html)
+        logger.info("💾 HTML preview saved: %s", preview_file)
+    except OSError as e:
+        logger.error("❌ Failed to save HTML preview: %s", e)
 
-        if success:
-            logger.info("🎉 Report sent successfully!")
-        else:
-            logger.error("❌ Failed to send report")
 
-        return success
+def _summary_cache_file(excel_file: str, excel_stat: os.stat_result, summary_sheet: str) -> Optional[Path]:
+    """
+    Cache path for the summary HTML rendered from a given report file.
 
-    except Exception as e:
-        logger.error(f"❌ Error in send_report: {e}", exc_info=True)
-        return False
+    The name is "summary-<report>-<version>.html": <report> covers the file's
+    path, the sheet and the currency, and <version> its size and modification
+    time, so a regenerated report never hits a stale entry. Returns None when
+    the cache is disabled (SUMMARY_CACHE_DIR unset, the default).
+    """
+    if not EmailConfig.SUMMARY_CACHE_DIR:
+        return None
+
+    report_key = _cache_digest(os.path.abspath(excel_file), summary_sheet, EmailConfig.REPORT_CURRENCY)
+    version_key = _cache_digest(str(excel_stat.st_size), str(excel_stat.st_mtime_ns))
+
+    cache_dir = Path(EmailConfig.SUMMARY_CACHE_DIR)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning("⚠️ Summary cache disabled, cannot create %s: %s", cache_dir, e)
+        return None
+    return cache_dir / f"summary-{report_key}-{version_key}.html"
+
+
+def _cache_digest(*parts: str) -> str:
+    """Short stable hex digest of some strings, for cache file names."""
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _read_summary_cache(cache_file: Path) -> Optional[str]:
+    """Return the cached summary HTML, or None on a miss or unreadable entry."""
+    try:
+        summary_html = cache_file.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning("⚠️ Ignoring unreadable summary cache entry %s: %s", cache_file, e)
+        return None
+
+    logger.info("♻️ Using cached summary HTML: %s", cache_file)
+    return summary_html
+
+
+def _write_summary_cache(cache_file: Path, summary_html: str) -> None:
+    """
+    Store the rendered summary HTML, logging rather than raising on failure.
+
+    The entry is written to a temp file and renamed into place, so an
+    interrupted write never leaves a truncated body for later runs to send.
+    Older versions of the same report are then deleted, keeping one entry
+    per report.
+    """
+    tmp_file = None
+    try:
+        fd, tmp_file = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(summary_html)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning("⚠️ Could not cache summary HTML: %s", e)
+        if tmp_file is not None:
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
+        return
+
+    # "summary-<report>-<version>.html": drop this report's other versions
+    report_prefix = cache_file.name.rsplit("-", 1)[0]
+    for old_file in cache_file.parent.glob(f"{report_prefix}-*.html"):
+        if old_file != cache_file:
+            try:
+                old_file.unlink()
+            except OSError:
+                pass
+
+
+# KPI section for a summary with no rows (no totals to compute)
+_EMPTY_KPI_HTML = _KPI_TEMPLATE.substitute(
+    total_customers_str=_COUNT_FORMAT(0),
+    total_revenue_str=f"{EmailConfig.REPORT_CURRENCY} {_MONEY_FORMAT(0)}",
+)
 
 
 def _generate_kpi_section(df_summary: pd.DataFrame) -> str:
     """Generate KPI summary section with total customers and revenue."""
-    try:
-        # Get currency from environment or default to MZN
-        currency = os.getenv("REPORT_CURRENCY", "MZN")
+    if df_summary.empty:
+        return _EMPTY_KPI_HTML
 
-        # Calculate totals
-        total_customers_visited = df_summary["CUSTOMERS VISITED"].sum()
-        total_customers_called = df_summary["CUSTOMERS CALLED"].sum()
-        total_customers = total_customers_visited + total_customers_called
+    try:
+        # Currency from environment (REPORT_CURRENCY), default MZN
+        currency = EmailConfig.REPORT_CURRENCY
 
-        total_revenue_visits = df_summary["ORDER VALUE FROM VISITS"].sum()
-        total_revenue_calls = df_summary["ORDER VALUE FROM CALLS"].sum()
-        total_revenue = total_revenue_visits + total_revenue_calls
+        # Calculate totals in one numpy reduction over the four KPI columns
+        kpi_values = df_summary[list(HTMLTableGenerator.COUNT_COLUMNS + HTMLTableGenerator.MONEY_COLUMNS)]
+        visited, called, revenue_visits, revenue_calls = np.nansum(
+            kpi_values.to_numpy(dtype=np.float64), axis=0
+        )
+        total_customers = visited + called
+        total_revenue = revenue_visits + revenue_calls
 
         # Format numbers
-        total_customers_str = f"{int(total_customers):,}"
-        total_revenue_str = f"{currency} {total_revenue:,.2f}"
+        total_customers_str = _COUNT_FORMAT(int(total_customers))
+        total_revenue_str = f"{currency} {_MONEY_FORMAT(total_revenue)}"
 
         # Generate KPI HTML
-        kpi_html = f"""
-        <div style="margin: 20px 0;">
-            <h3 style="color: #4F81BD; margin-bottom: 15px;">Key Performance Indicators</h3>
-            <table style="border-collapse: collapse; width: 100%; margin-bottom: 20px;">
-                <tr>
-                    <td style="padding: 15px; background-color: #E8F4F8; border: 2px solid #4F81BD; width: 50%; text-align: center;">
-                        <div style="font-size: 14px; color: #666; margin-bottom: 5px;">TOTAL CUSTOMERS (Visited & Called)</div>
-                        <div style="font-size: 28px; font-weight: bold; color: #4F81BD;">{total_customers_str}</div>
-                    </td>
-                    <td style="padding: 15px; background-color: #E8F4F8; border: 2px solid #4F81BD; width: 50%; text-align: center;">
-                        <div style="font-size: 14px; color: #666; margin-bottom: 5px;">TOTAL ORDER REVENUE</div>
-                        <div style="font-size: 28px; font-weight: bold; color: #4F81BD;">{total_revenue_str}</div>
-                    </td>
-                </tr>
-            </table>
-        </div>
-        """
+        kpi_html = _KPI_TEMPLATE.substitute(
+            total_customers_str=total_customers_str,
+            total_revenue_str=total_revenue_str,
+        )
 
         return kpi_html
 
     except Exception as e:
-        logger.error(f"Error generating KPI section: {e}")
+        logger.error("Error generating KPI section: %s", e)
         return ""
 
 
@@ -521,7 +828,8 @@ def main():
     logger.info("CSFA Report Email Sender")
     logger.info("=" * 60)
 
-    success = send_report()
+    with EmailSender(EmailConfig):
+        success = send_report()
 
     if success:
         logger.info("✅ Done!")
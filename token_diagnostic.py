@@ -3,74 +3,93 @@ Token Diagnostic Script
 Helps diagnose issues with environment variables and tokens.
 """
 
+import io
 import os
+import re
 import sys
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# ASCII control characters (code points below 32)
+_CONTROL_CHARS = re.compile(r"[\x00-\x1f]")
 
-def diagnose_token(var_name: str) -> None:
-    """Diagnose a specific environment variable."""
-    print(f"\n{'='*70}")
-    print(f"Diagnosing: {var_name}")
-    print('='*70)
+
+def token_report(var_name: str) -> str:
+    """Build the diagnostic text for a specific environment variable."""
+    out = io.StringIO()
+
+    def emit(*parts) -> None:
+        print(*parts, file=out)
+
+    emit(f"\n{'='*70}")
+    emit(f"Diagnosing: {var_name}")
+    emit('='*70)
 
     value = os.getenv(var_name)
 
     if value is None:
-        print(f"❌ {var_name} is NOT SET in environment")
-        return
+        emit(f"❌ {var_name} is NOT SET in environment")
+        return out.getvalue()
+
+    # Text form of the value, built once for all the checks below
+    value_str = str(value)
+    value_len = len(value_str)
 
-    print(f"✅ {var_name} is set")
-    print(f"   Type: {type(value)}")
-    print(f"   Length: {len(str(value))} characters")
+    emit(f"✅ {var_name} is set")
+    emit(f"   Type: {type(value)}")
+    emit(f"   Length: {value_len} characters")
 
     # Check if it's bytes
     if isinstance(value, bytes):
-        print(f"   ⚠️  WARNING: Value is bytes, not string!")
-        print(f"   Raw bytes: {value}")
+        emit(f"   ⚠️  WARNING: Value is bytes, not string!")
+        emit(f"   Raw bytes: {value}")
         try:
             decoded = value.decode('utf-8')
-            print(f"   Decoded: {decoded[:20]}...")
+            emit(f"   Decoded: {decoded[:20]}...")
         except:
-            print(f"   ❌ Cannot decode bytes to UTF-8")
+            emit(f"   ❌ Cannot decode bytes to UTF-8")
     else:
         # Show first and last few characters
-        value_str = str(value)
-        if len(value_str) > 40:
+        if value_len > 40:
             display = f"{value_str[:20]}...{value_str[-20:]}"
         else:
             display = value_str
-        print(f"   Value: {display}")
+        emit(f"   Value: {display}")
 
     # Check for common issues
     if value == '***':
-        print(f"   ❌ PROBLEM: Token is masked as '***'")
-        print(f"   This happens in CI/CD when secrets aren't properly injected")
+        emit(f"   ❌ PROBLEM: Token is masked as '***'")
+        emit(f"   This happens in CI/CD when secrets aren't properly injected")
 
     if value.startswith('***'):
-        print(f"   ❌ PROBLEM: Token starts with '***' (partially masked)")
+        emit(f"   ❌ PROBLEM: Token starts with '***' (partially masked)")
 
     # Check for whitespace
-    value_str = str(value)
     if value_str != value_str.strip():
-        print(f"   ⚠️  WARNING: Token has leading/trailing whitespace")
-        print(f"   Stripped length: {len(value_str.strip())}")
+        emit(f"   ⚠️  WARNING: Token has leading/trailing whitespace")
+        emit(f"   Stripped length: {len(value_str.strip())}")
 
     # Check for quotes
     if value_str.startswith('"') or value_str.startswith("'"):
-        print(f"   ⚠️  WARNING: Token starts with a quote character")
+        emit(f"   ⚠️  WARNING: Token starts with a quote character")
 
     # Check for control characters
-    control_chars = [c for c in value_str if ord(c) < 32]
+    control_chars = _CONTROL_CHARS.findall(value_str)
     if control_chars:
-        print(f"   ⚠️  WARNING: Token contains {len(control_chars)} control characters")
+        emit(f"   ⚠️  WARNING: Token contains {len(control_chars)} control characters")
 
     # Check minimum length
-    if len(value_str) < 50:
-        print(f"   ⚠️  WARNING: Token seems short (usually >50 characters for JWT)")
+    if value_len < 50:
+        emit(f"   ⚠️  WARNING: Token seems short (usually >50 characters for JWT)")
+
+    return out.getvalue()
+
+
+def diagnose_token(var_name: str) -> None:
+    """Diagnose a specific environment variable."""
+    sys.stdout.write(token_report(var_name))
 
 
 def main():
@@ -93,8 +112,8 @@ def main():
         "XSRF_TOKEN"
     ]
 
-    for token in tokens:
-        diagnose_token(token)
+    # Build every token's report first, then write them in one call
+    sys.stdout.write("".join(token_report(token) for token in tokens))
 
     print("\n" + "="*70)
     print("ENVIRONMENT INFORMATION")
@@ -111,8 +130,10 @@ def main():
     print("RECOMMENDATIONS")
     print("="*70)
 
-    all_set = all(os.getenv(t) for t in tokens)
-    any_masked = any(os.getenv(t) in ['***', None] or (os.getenv(t) or '').startswith('***') for t in tokens)
+    # Look each token up once for both checks
+    values = [os.environ.get(t) for t in tokens]
+    all_set = all(values)
+    any_masked = any(v in ['***', None] or (v or '').startswith('***') for v in values)
 
     if not all_set:
         print("❌ Some tokens are missing:")